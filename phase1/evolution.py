@@ -20,12 +20,24 @@ Outputs:
 import os
 import sys
 import argparse
+import contextlib
+import difflib
 import random
-import shutil
+import hashlib
+import io
+import itertools
+import logging
+import pickle
+import queue
+import multiprocessing
+from multiprocessing import shared_memory
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime
 
 # Import our modules
-from mutation import load_program, save_program_to_string, apply_random_mutation, crossover_single
+from mutation import (load_program, save_program_to_string, apply_random_mutation, is_valid_source,
+                      find_operator_sites, find_safe_pivots, save_syntax_cache)
 from test_harness import TestHarness
 
 
@@ -33,7 +45,16 @@ from test_harness import TestHarness
 POPULATION_SIZE = 40
 NUM_GENERATIONS = 50
 SURVIVOR_RATIO = 0.5  # Keep top 50%
-TEMP_DIR = "temp_variants"
+NUM_WORKERS = multiprocessing.cpu_count()  # Processes evaluating variants in parallel
+CHUNKS_PER_WORKER = 4  # Task batches handed to each worker per generation (fewer = less IPC)
+FITNESS_CACHE_SIZE = 4096  # Max remembered variant fitnesses (LRU)
+FITNESS_CACHE_FILE = ".fitness_cache.pkl"  # Per-benchmark fitness cache kept between runs
+CACHE_SAVE_INTERVAL = 5  # Generations between saves of the fitness cache file
+FITNESS_CACHE_PROTOCOL = pickle.HIGHEST_PROTOCOL  # Pickle protocol of the fitness cache file
+NUM_ISLANDS = 1  # Sub-populations evolving in separate processes (1 = single population)
+MIGRATION_INTERVAL = 5  # Generations between migrations (island model)
+MIGRANTS = 1  # Individuals sent to the neighbouring island per migration
+MUTATION_ATTEMPTS = 3  # apply_random_mutation() calls per new variant, pooled over the whole population
 
 
 def parse_args():
@@ -46,6 +67,7 @@ Examples:
     python evolution.py benchmark1
     python evolution.py benchmark2 --generations 100
     python evolution.py benchmarks/benchmark3 --population 60
+    python evolution.py benchmark4 --islands 4
         """
     )
     
@@ -68,6 +90,20 @@ Examples:
         help=f"Population size (default: {POPULATION_SIZE})"
     )
     
+    parser.add_argument(
+        "--islands", "-i",
+        type=int,
+        default=NUM_ISLANDS,
+        help=f"Number of islands for the island-model GA (default: {NUM_ISLANDS}, "
+             f"a single population evaluated by a worker pool)"
+    )
+    
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"Ignore and don't update the benchmark's saved fitness cache ({FITNESS_CACHE_FILE})"
+    )
+    
     parser.add_argument(
         "--verbose", "-v",
         action="store_true",
@@ -112,54 +148,121 @@ def list_available_benchmarks():
             if os.path.isdir(os.path.join(benchmarks_dir, d))]
 
 
-def setup_temp_directory():
-    """Creates the temporary directory for variant files."""
-    if os.path.exists(TEMP_DIR):
-        shutil.rmtree(TEMP_DIR)
-    os.makedirs(TEMP_DIR)
-
-
-def cleanup_temp_directory():
-    """Removes the temporary directory and all its contents."""
-    if os.path.exists(TEMP_DIR):
-        shutil.rmtree(TEMP_DIR)
-
+# === VARIANT REPRESENTATION ===
 
-def get_temp_filepath(index):
-    """Returns a UNIQUE temporary file path for a given variant index."""
-    return os.path.join(TEMP_DIR, f"variant_{index}.py")
+@dataclass(frozen=True)
+class Variant:
+    """
+    A program variant stored as a sparse diff against the original program.
+    
+    Variants usually differ from the original in one or two lines, so only
+    those are kept: changes = ((slot_index, new_text), ...) in slot order.
+    A slot is one line of the original program; an INSERT mutation leaves two
+    lines in one slot, so slots always line up with the original line numbers.
+    
+    Variants are immutable and hashable: they are their own fitness-cache key
+    and are cheap to pickle across process boundaries.
+    """
+    changes: tuple = ()
+    # Joined source text and slot offsets into it, filled in lazily by source() and
+    # slot_offsets() (not part of the identity, and not pickled)
+    _source: str = field(default=None, compare=False, repr=False)
+    _offsets: list = field(default=None, compare=False, repr=False)
+    
+    def __reduce__(self):
+        # Only the diff crosses process boundaries; the caches are rebuilt on demand
+        return (Variant, (self.changes,))
+    
+    def with_patch(self, original_lines, patch):
+        """
+        Returns a new variant with a mutation patch (see apply_random_mutation())
+        applied on top of this one, without materializing the full program.
+        """
+        changes = dict(self.changes)
+        for i, line in patch:
+            if line == original_lines[i]:
+                changes.pop(i, None)
+            else:
+                changes[i] = line
+        return Variant(tuple(sorted(changes.items())))
+    
+    def materialize(self, original_lines):
+        """Returns the variant as a list of slot lines (input for the mutation operators)."""
+        lines = list(original_lines)
+        for i, line in self.changes:
+            lines[i] = line
+        return lines
+    
+    def source(self, original_lines):
+        """
+        Returns the variant's full source text.
+        
+        The text is joined once and kept on the variant, so saving a solution
+        and writing its report share one copy. A variant always belongs to one
+        original program, which is why original_lines isn't part of the cache.
+        """
+        if self._source is None:
+            object.__setattr__(self, "_source", save_program_to_string(self.materialize(original_lines)))
+        return self._source
+    
+    def slot_offsets(self, original_lines):
+        """Returns the character offset of every slot in source() (plus the end offset)."""
+        if self._offsets is None:
+            offsets = [0]
+            offsets.extend(itertools.accumulate(len(line) for line in self.materialize(original_lines)))
+            object.__setattr__(self, "_offsets", offsets)
+        return self._offsets
+    
+    def source_lines(self, original_lines):
+        """Returns the variant as real source lines (for saving and reporting)."""
+        return self.source(original_lines).splitlines(keepends=True)
 
 
-def save_variant_to_file(lines, filepath):
-    """Saves a code variant (list of lines) to a file."""
-    code_str = save_program_to_string(lines)
+def save_variant_to_file(source, filepath):
+    """Saves a code variant (its full source text) to a file."""
     with open(filepath, 'w') as f:
-        f.write(code_str)
+        f.write(source)
 
 
-def find_changed_lines(original_lines, repaired_lines):
+def find_changed_lines(original_lines, variant):
     """
-    Compares original and repaired code to find what changed.
+    Lists what a variant changed in the original code.
+    
+    Only the variant's own changes are visited, not the whole program. A slot
+    that holds several lines (after an INSERT) is aligned with its original
+    line by difflib, so the added line is reported on its own, with '<no line>'
+    before it.
+    
+    Every entry is numbered by its line in the repaired program (a deleted
+    line by the position it would have had), so inserted lines shift the numbers
+    of the changes after them.
     
     Returns:
         list of tuples: [(line_number, original_code, repaired_code), ...]
     """
     changes = []
+    added = 0  # Lines inserted (or removed) by earlier slots
     
-    # Compare line by line
-    max_lines = max(len(original_lines), len(repaired_lines))
-    
-    for i in range(max_lines):
-        if i >= len(original_lines):
-            # New line added
-            changes.append((i + 1, "<no line>", repaired_lines[i].strip()))
-        elif i >= len(repaired_lines):
-            # Line removed
-            changes.append((i + 1, original_lines[i].strip(), "<deleted>"))
-        elif original_lines[i] != repaired_lines[i]:
-            # Line modified
-            changes.append((i + 1, original_lines[i].strip(), repaired_lines[i].strip()))
-    
+    for i, text in variant.changes:
+        new_lines = text.splitlines()
+        if len(new_lines) == 1:
+            changes.append((i + added + 1, original_lines[i].strip(), new_lines[0].strip()))
+            continue
+            
+        old_lines = original_lines[i].splitlines()
+        matcher = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False)
+        for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+            if tag == "equal":
+                continue
+            for k in range(max(i2 - i1, j2 - j1)):
+                line_number = i + added + min(j1 + k, j2) + 1
+                if i1 + k < i2:
+                    after = new_lines[j1 + k].strip() if j1 + k < j2 else "<deleted>"
+                    changes.append((line_number, old_lines[i1 + k].strip(), after))
+                else:
+                    changes.append((line_number, "<no line>", new_lines[j1 + k].strip()))
+        added += len(new_lines) - len(old_lines)
+        
     return changes
 
 
@@ -173,7 +276,7 @@ def write_summary_report(
     max_fitness,
     achieved_fitness,
     original_lines,
-    repaired_lines,
+    repaired_variant,
     weighted_lines
 ):
     """
@@ -185,139 +288,367 @@ def write_summary_report(
     - The genetic algorithm parameters used
     """
     report_path = os.path.join(benchmark_dir, "report_summary.txt")
+    repaired_lines = repaired_variant.source_lines(original_lines) if repaired_variant else None
     
-    with open(report_path, 'w') as f:
-        f.write("=" * 70 + "\n")
-        f.write("         AUTOMATED PROGRAM REPAIR - SUMMARY REPORT\n")
-        f.write("=" * 70 + "\n\n")
-        
-        # Basic Info
-        f.write(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-        f.write(f"Benchmark: {benchmark_name}\n")
-        f.write(f"Function Tested: {function_name}()\n\n")
-        
-        # Result
-        f.write("-" * 70 + "\n")
-        f.write("RESULT\n")
-        f.write("-" * 70 + "\n")
-        if success:
-            f.write("Status: SUCCESS - Perfect repair found!\n")
-        else:
-            f.write("Status: FAILURE - No perfect repair found.\n")
-        f.write(f"Final Fitness: {achieved_fitness}/{max_fitness}\n")
-        f.write(f"Generations Run: {generations_run}\n")
-        if success:
-            f.write(f"Solution Found At: Generation {final_generation}\n")
-        f.write("\n")
-        
-        # Fault Localization
-        f.write("-" * 70 + "\n")
-        f.write("FAULT LOCALIZATION\n")
-        f.write("-" * 70 + "\n")
-        f.write("Suspicious lines identified (higher weight = more suspicious):\n")
-        for line_num, weight in weighted_lines:
-            if weight > 0:
-                f.write(f"  Line {line_num}: weight = {weight}\n")
-        f.write("\n")
-        
-        # Code Changes
-        f.write("-" * 70 + "\n")
-        f.write("CODE CHANGES\n")
-        f.write("-" * 70 + "\n")
+    # Build the whole report in memory and write it in one go
+    parts = []
+    out = parts.append
+    
+    out("=" * 70 + "\n")
+    out("         AUTOMATED PROGRAM REPAIR - SUMMARY REPORT\n")
+    out("=" * 70 + "\n\n")
+    
+    # Basic Info
+    out(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+    out(f"Benchmark: {benchmark_name}\n")
+    out(f"Function Tested: {function_name}()\n\n")
+    
+    # Result
+    out("-" * 70 + "\n")
+    out("RESULT\n")
+    out("-" * 70 + "\n")
+    if success:
+        out("Status: SUCCESS - Perfect repair found!\n")
+    else:
+        out("Status: FAILURE - No perfect repair found.\n")
+    out(f"Final Fitness: {achieved_fitness}/{max_fitness}\n")
+    out(f"Generations Run: {generations_run}\n")
+    if success:
+        out(f"Solution Found At: Generation {final_generation}\n")
+    out("\n")
+    
+    # Fault Localization
+    out("-" * 70 + "\n")
+    out("FAULT LOCALIZATION\n")
+    out("-" * 70 + "\n")
+    out("Suspicious lines identified (higher weight = more suspicious):\n")
+    for line_num, weight in weighted_lines:
+        if weight > 0:
+            out(f"  Line {line_num}: weight = {weight}\n")
+    out("\n")
+    
+    # Code Changes
+    out("-" * 70 + "\n")
+    out("CODE CHANGES\n")
+    out("-" * 70 + "\n")
+    
+    if repaired_lines:
+        changes = find_changed_lines(original_lines, repaired_variant)
         
-        if repaired_lines:
-            changes = find_changed_lines(original_lines, repaired_lines)
-            
-            if changes:
-                f.write(f"Total lines changed: {len(changes)}\n\n")
-                for line_num, before, after in changes:
-                    f.write(f"Line {line_num}:\n")
-                    f.write(f"  BEFORE: {before}\n")
-                    f.write(f"  AFTER:  {after}\n\n")
-            else:
-                f.write("No code changes detected (unexpected).\n")
+        if changes:
+            out(f"Total lines changed: {len(changes)}\n\n")
+            for line_num, before, after in changes:
+                out(f"Line {line_num}:\n")
+                out(f"  BEFORE: {before}\n")
+                out(f"  AFTER:  {after}\n\n")
         else:
-            f.write("No successful repair to compare.\n")
-        
-        # Original Code
-        f.write("-" * 70 + "\n")
-        f.write("ORIGINAL CODE (patient.py)\n")
-        f.write("-" * 70 + "\n")
-        for i, line in enumerate(original_lines, 1):
-            f.write(f"{i:3}: {line.rstrip()}\n")
-        f.write("\n")
-        
-        # Repaired Code (if available)
-        if repaired_lines:
-            f.write("-" * 70 + "\n")
-            f.write("REPAIRED CODE (repaired_solution.py)\n")
-            f.write("-" * 70 + "\n")
-            for i, line in enumerate(repaired_lines, 1):
-                f.write(f"{i:3}: {line.rstrip()}\n")
-        
-        f.write("\n" + "=" * 70 + "\n")
-        f.write("END OF REPORT\n")
-        f.write("=" * 70 + "\n")
+            out("No code changes detected (unexpected).\n")
+    else:
+        out("No successful repair to compare.\n")
+    
+    # Original Code
+    out("-" * 70 + "\n")
+    out("ORIGINAL CODE (patient.py)\n")
+    out("-" * 70 + "\n")
+    parts.extend(f"{i:3}: {line.rstrip()}\n" for i, line in enumerate(original_lines, 1))
+    out("\n")
+    
+    # Repaired Code (if available)
+    if repaired_lines:
+        out("-" * 70 + "\n")
+        out("REPAIRED CODE (repaired_solution.py)\n")
+        out("-" * 70 + "\n")
+        parts.extend(f"{i:3}: {line.rstrip()}\n" for i, line in enumerate(repaired_lines, 1))
+    
+    out("\n" + "=" * 70 + "\n")
+    out("END OF REPORT\n")
+    out("=" * 70 + "\n")
+    
+    with open(report_path, 'w') as f:
+        f.write("".join(parts))
     
     return report_path
 
 
-def initialize_population(original_lines, weighted_lines, population_size):
+def initialize_population(original_lines, weighted_lines, population_size, operator_sites=None):
     """
     Creates the initial population of variants.
     
     Strategy:
-    - Variant 0: The original (buggy) program (baseline).
-    - Variants 1+: Mutated versions of the original.
+    - The original (buggy) program is evaluated once up front as the baseline,
+      so it only takes a slot when the population has room for nothing else.
+    - Every other variant is a mutated version of the original.
     """
     population = []
     
-    # First variant is the original
-    population.append(original_lines[:])
+    if population_size == 1:
+        population.append(Variant())
     
-    # Generate more mutants
-    for i in range(1, population_size):
+    # One retry budget for the whole population: each call already tries every
+    # applicable operator, so a failure usually means a bad target line
+    attempts_left = MUTATION_ATTEMPTS * population_size
+    
+    # Generate mutants
+    while len(population) < population_size:
         mutant = None
-        attempts = 0
         
-        while mutant is None and attempts < 10:
-            mutant = apply_random_mutation(original_lines[:], weighted_lines)
-            attempts += 1
+        while mutant is None and attempts_left > 0:
+            mutant = apply_random_mutation(original_lines, weighted_lines, operator_sites)
+            attempts_left -= 1
         
         if mutant is None:
-            mutant = original_lines[:]
-            
-        population.append(mutant)
+            population.append(Variant())
+        else:
+            population.append(Variant().with_patch(original_lines, mutant))
     
     return population
 
 
-def evaluate_population(population, harness, verbose=False):
+# === PARALLEL EVALUATION (Master-Slave GA) ===
+
+# Harness and original program owned by a worker process (set once by _init_worker)
+_worker_harness = None
+_worker_original_lines = None
+
+
+def _init_worker(benchmark_dir, test_data_name=None):
+    """
+    Pool initializer: runs once in every worker process.
+    
+    Each worker builds its own TestHarness once and reuses it for every task.
+    With test_data_name, the tests and the original program come from the
+    shared memory block written by share_test_data() instead of from disk.
+    """
+    global _worker_harness, _worker_original_lines
+    
+    if test_data_name is None:
+        _worker_harness = TestHarness(benchmark_dir)
+        _worker_original_lines = load_program(_worker_harness.get_patient_path())
+        return
+        
+    block = shared_memory.SharedMemory(name=test_data_name)
+    try:
+        config, _worker_original_lines = pickle.loads(block.buf)
+    finally:
+        block.close()
+    _worker_harness = TestHarness(benchmark_dir, config=config)
+
+
+def _evaluate_one(args):
+    """
+    Worker task: evaluates a single variant.
+    
+    Args:
+        args: tuple (index, variant, debug, prune_below)
+        
+    Returns:
+        tuple: (index, fitness)
+    """
+    index, variant, debug, prune_below = args
+    
+    # Variants are compiled and run in memory, no temp files involved
+    lines = variant.materialize(_worker_original_lines)
+    fitness = _worker_harness.evaluate_lines(lines, debug=debug, prune_below=prune_below)
+    
+    return index, fitness
+
+
+def share_test_data(test_config, original_lines):
+    """
+    Publishes the parsed tests and the original program to the workers.
+    
+    The data is pickled once into a shared memory block that every worker
+    reads at startup, so no worker re-reads or re-parses the benchmark files.
+    The caller must release_test_data() the block when the pool is done.
+    
+    Returns:
+        SharedMemory: The block (pass block.name to create_worker_pool)
+    """
+    payload = pickle.dumps((test_config, original_lines), protocol=pickle.HIGHEST_PROTOCOL)
+    block = shared_memory.SharedMemory(create=True, size=len(payload))
+    block.buf[:len(payload)] = payload
+    return block
+
+
+def release_test_data(block):
+    """Frees the shared memory block created by share_test_data()."""
+    block.close()
+    block.unlink()
+
+
+def create_worker_pool(benchmark_dir, test_data_name=None, num_workers=NUM_WORKERS):
+    """Creates the pool of persistent worker processes used for fitness evaluation."""
+    return multiprocessing.Pool(
+        processes=num_workers,
+        initializer=_init_worker,
+        initargs=(benchmark_dir, test_data_name)
+    )
+
+
+def pool_imap(pool, num_workers=NUM_WORKERS):
+    """
+    Wraps pool.imap_unordered so each worker receives its tasks in a few batches.
+    
+    Patient functions run in microseconds, so pickling and sending one task at a
+    time costs more than the evaluation itself. Splitting the tasks into about
+    CHUNKS_PER_WORKER batches per worker amortizes that overhead while still
+    leaving enough batches to balance the load.
+    
+    Args:
+        pool: The worker pool
+        num_workers: Number of processes in the pool
+        
+    Returns:
+        function: imap(func, tasks) for evaluate_population (tasks must be a list)
+    """
+    def imap(func, tasks):
+        chunksize = max(1, len(tasks) // (CHUNKS_PER_WORKER * num_workers))
+        return pool.imap_unordered(func, tasks, chunksize=chunksize)
+    return imap
+
+
+def shutdown_worker_pool(pool):
+    """Stops the worker processes once evolution is over."""
+    pool.close()
+    pool.join()
+
+
+# === FITNESS CACHE ===
+
+def cache_fitness(fitness_cache, key, fitness):
+    """Stores a fitness in the LRU cache, evicting the oldest entry when full."""
+    fitness_cache[key] = fitness
+    fitness_cache.move_to_end(key)
+    if len(fitness_cache) > FITNESS_CACHE_SIZE:
+        fitness_cache.popitem(last=False)
+
+
+def record_persistent_fitness(persistent_cache, scored_population, prune_below, baseline_fitness):
+    """
+    Copies the fitness values that are valid in any later run into persistent_cache.
+    
+    A pruned score is only a lower bound and is known to be below the prune_below
+    it was evaluated with. It is kept only when that bound was the baseline:
+    every run starts from the same baseline and prunes at least as hard.
+    Scores at or above prune_below were never pruned and are always kept.
+    """
+    for variant, fitness in scored_population:
+        if fitness >= prune_below or prune_below <= baseline_fitness:
+            cache_fitness(persistent_cache, variant, fitness)
+
+
+def fitness_cache_version(benchmark_dir):
+    """
+    Hashes everything a cached fitness depends on: the patient program, its
+    tests, the scoring code, the mutation code (which defines line slots),
+    this module (the Variant encoding), the Python version (sum() rounding,
+    AST changes) and the cache file's pickle protocol.
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.blake2b()
+    digest.update(repr((sys.version_info[:2], FITNESS_CACHE_PROTOCOL)).encode())
+    for path in (os.path.join(benchmark_dir, "patient.py"), os.path.join(benchmark_dir, "tests.json"),
+                 os.path.join(here, "test_harness.py"), os.path.join(here, "mutation.py"),
+                 os.path.join(here, "evolution.py")):
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def load_fitness_cache(benchmark_dir):
+    """
+    Loads the fitness cache saved by an earlier run on this benchmark.
+    
+    Returns:
+        OrderedDict: Variant -> fitness, empty if there is no valid cache file
+    """
+    path = os.path.join(benchmark_dir, FITNESS_CACHE_FILE)
+    if not os.path.exists(path):
+        return OrderedDict()
+        
+    try:
+        # Truncated or foreign files can fail in many ways (EOFError,
+        # UnpicklingError, AttributeError/ImportError for unknown classes...)
+        with open(path, 'rb') as f:
+            saved = pickle.load(f)
+    except Exception as e:
+        print(f"  Ignoring unreadable fitness cache: {e}")
+        return OrderedDict()
+        
+    if not isinstance(saved, dict) or not isinstance(saved.get("fitness"), dict):
+        print("  Ignoring fitness cache that was not written by this tool")
+        return OrderedDict()
+    if saved.get("version") != fitness_cache_version(benchmark_dir):
+        print("  Ignoring fitness cache from an older version of the benchmark or tool")
+        return OrderedDict()
+    return OrderedDict(saved["fitness"])
+
+
+def save_fitness_cache(benchmark_dir, persistent_cache):
+    """Saves the fitness cache for later runs (written to a temp file, then renamed)."""
+    path = os.path.join(benchmark_dir, FITNESS_CACHE_FILE)
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump({"version": fitness_cache_version(benchmark_dir), "fitness": persistent_cache}, f,
+                    protocol=FITNESS_CACHE_PROTOCOL)
+    os.replace(temp_path, path)
+
+
+def evaluate_population(population, imap, fitness_cache, verbose=False, prune_below=0.0):
     """
     Evaluates fitness for ALL variants in the population.
     
+    The master process keeps the population; imap runs the tests. With a worker
+    pool (see pool_imap) results stream back in completion order and are put
+    back in population order. Islands evaluate in-process with the built-in map.
+    
+    Variants already in fitness_cache (e.g. survivors of the previous generation)
+    are not re-run, and identical variants within a generation run only once.
+    
+    prune_below is normally the best fitness found so far: a variant that can
+    no longer reach it stops testing early and scores its (lower) partial fitness.
+    Since the best fitness never decreases, caching partial scores is safe.
+    
     Returns:
-        list of tuples: [(variant_lines, fitness_score), ...]
+        list of tuples: [(variant, fitness_score), ...]
     """
-    scored_population = []
+    # Variants are hashable sparse diffs and serve as their own cache keys
+    keys = population
     
-    for i, variant in enumerate(population):
-        # Save to unique temp file
-        filepath = get_temp_filepath(i)
-        save_variant_to_file(variant, filepath)
+    # Group indices of identical variants that still need evaluating
+    fitness_by_key = {}
+    pending = OrderedDict()
+    for i, key in enumerate(keys):
+        if key in fitness_cache:
+            fitness_cache.move_to_end(key)
+            fitness_by_key[key] = fitness_cache[key]
+        else:
+            pending.setdefault(key, []).append(i)
+    
+    # Debug mode for first 3 variants if verbose
+    tasks = [(indices[0], population[indices[0]], verbose and indices[0] < 3, prune_below)
+             for indices in pending.values()]
+    
+    for done, (i, fitness) in enumerate(imap(_evaluate_one, tasks), 1):
+        fitness_by_key[keys[i]] = fitness
+        cache_fitness(fitness_cache, keys[i], fitness)
         
-        # Evaluate fitness using the harness
-        debug = verbose and i < 3  # Debug mode for first 3 variants if verbose
-        fitness = harness.evaluate_file(filepath, debug=debug)
+        # Progress indicator
+        if done % 10 == 0:
+            print(f"  Evaluated {done}/{len(pending)} new variants...")
+    
+    scored_population = []
+    for i, (variant, key) in enumerate(zip(population, keys)):
+        fitness = fitness_by_key[key]
         scored_population.append((variant, fitness))
         
         # Show non-zero fitness
         if fitness > 0:
             print(f"  Variant {i}: fitness = {fitness}")
-        
-        # Progress indicator
-        if (i + 1) % 10 == 0:
-            print(f"  Evaluated {i + 1}/{len(population)} variants...")
+    
+    skipped = len(population) - len(pending)
+    if skipped:
+        print(f"  Reused cached fitness for {skipped}/{len(population)} variants")
     
     return scored_population
 
@@ -341,7 +672,50 @@ def select_survivors(scored_population):
 MUTATION_PROBABILITY = 0.5
 
 
-def repopulate(survivors, weighted_lines, population_size):
+def crossover_variants(parent_a, parent_b, original_lines, max_attempts=5):
+    """
+    One-point crossover (GenProg, Figure 1 line 10) done directly on sparse diffs.
+    
+    A child takes parent_a's changes before the pivot slot and parent_b's from
+    the pivot on. Pivots are drawn from the original program's statement
+    boundaries (find_safe_pivots) when it has any. Its source text for the
+    syntax check is cut from the parents' cached source strings at the pivot's
+    character offsets, so no line list is copied or joined; the text is kept
+    on the child for later use.
+    
+    Returns:
+        Variant: One valid offspring (picked at random if both are valid),
+                 or None if no pivot gave valid syntax
+    """
+    num_slots = len(original_lines)
+    if num_slots <= 1:
+        return None
+        
+    source_a, offsets_a = parent_a.source(original_lines), parent_a.slot_offsets(original_lines)
+    source_b, offsets_b = parent_b.source(original_lines), parent_b.slot_offsets(original_lines)
+    safe_pivots = find_safe_pivots(original_lines)
+    
+    for attempt in range(max_attempts):
+        pivot = random.choice(safe_pivots) if safe_pivots else random.randint(1, num_slots - 1)
+        
+        offspring = []
+        for (head, head_src, head_offsets), (tail, tail_src, tail_offsets) in (
+                ((parent_a, source_a, offsets_a), (parent_b, source_b, offsets_b)),
+                ((parent_b, source_b, offsets_b), (parent_a, source_a, offsets_a))):
+            child_source = head_src[:head_offsets[pivot]] + tail_src[tail_offsets[pivot]:]
+            if is_valid_source(child_source):
+                child = Variant(tuple(c for c in head.changes if c[0] < pivot) +
+                                tuple(c for c in tail.changes if c[0] >= pivot))
+                object.__setattr__(child, "_source", child_source)
+                offspring.append(child)
+                
+        if offspring:
+            return random.choice(offspring)
+            
+    return None
+
+
+def repopulate(survivors, original_lines, weighted_lines, population_size, operator_sites=None):
     """
     Fills the population back to population_size using crossover and mutation.
     
@@ -362,6 +736,9 @@ def repopulate(survivors, weighted_lines, population_size):
     crossover_successes = 0
     mutation_only_count = 0
     
+    # Mutation retries are shared by all children (see initialize_population)
+    attempts_left = MUTATION_ATTEMPTS * (population_size - len(new_population))
+    
     while len(new_population) < population_size:
         # Select two different parents
         if len(survivors) >= 2:
@@ -371,36 +748,40 @@ def repopulate(survivors, weighted_lines, population_size):
             parent_a = parent_b = random.choice(survivors)
         
         child = None
+        parent = None
         
         # Try crossover first
         crossover_attempts += 1
-        child = crossover_single(parent_a[:], parent_b[:])
+        offspring = crossover_variants(parent_a, parent_b, original_lines)
         
-        if child is not None:
+        if offspring is not None:
             crossover_successes += 1
             # With probability, also apply mutation to the crossed-over child
             if random.random() < MUTATION_PROBABILITY:
-                mutated_child = None
-                attempts = 0
-                while mutated_child is None and attempts < 5:
-                    mutated_child = apply_random_mutation(child[:], weighted_lines)
-                    attempts += 1
-                if mutated_child is not None:
-                    child = mutated_child
+                offspring_lines = offspring.materialize(original_lines)
+                while child is None and attempts_left > 0:
+                    child = apply_random_mutation(offspring_lines, weighted_lines, operator_sites)
+                    attempts_left -= 1
+            if child is None:
+                new_population.append(offspring)
+                continue
+            parent = offspring
         else:
             # Crossover failed (syntax error), fall back to mutation only
             mutation_only_count += 1
-            parent = random.choice(survivors)[:]
-            attempts = 0
-            while child is None and attempts < 10:
-                child = apply_random_mutation(parent, weighted_lines)
-                attempts += 1
+            parent = random.choice(survivors)
+            parent_lines = parent.materialize(original_lines)
+            while child is None and attempts_left > 0:
+                child = apply_random_mutation(parent_lines, weighted_lines, operator_sites)
+                attempts_left -= 1
             
             if child is None:
-                # All attempts failed, use parent copy
-                child = parent[:]
+                # All attempts failed, use the parent
+                new_population.append(parent)
+                continue
         
-        new_population.append(child)
+        # Only an accepted mutation is applied, as a patch on its parent's diff
+        new_population.append(parent.with_patch(original_lines, child))
     
     # Report crossover statistics (optional, can be removed for cleaner output)
     if crossover_attempts > 0:
@@ -411,7 +792,307 @@ def repopulate(survivors, weighted_lines, population_size):
     return new_population
 
 
-def run_evolution(benchmark_dir, num_generations, population_size, verbose=False):
+def report_repair(benchmark_dir, harness, original_lines, weighted_lines,
+                  variant, fitness, generation, num_generations):
+    """Saves and reports a perfect repair. Returns the report path."""
+    print("\n" + "=" * 60)
+    print("  SUCCESS! PERFECT REPAIR FOUND!")
+    print("=" * 60)
+    
+    # Save the winning variant to benchmark folder
+    solution_path = os.path.join(benchmark_dir, "repaired_solution.py")
+    save_variant_to_file(variant.source(original_lines), solution_path)
+    print(f"\n  Solution saved to: {solution_path}")
+    print(f"  Fitness: {fitness}/{harness.max_fitness}")
+    print(f"  Generation: {generation}")
+    
+    # Find and display the changes
+    changes = find_changed_lines(original_lines, variant)
+    if changes:
+        listing = [f"\n  Code changes ({len(changes)} lines modified):"]
+        for line_num, before, after in changes:
+            listing.append(f"    Line {line_num}:")
+            listing.append(f"      BEFORE: {before}")
+            listing.append(f"      AFTER:  {after}")
+        print("\n".join(listing))
+    
+    # Write summary report
+    report_path = write_summary_report(
+        benchmark_dir=benchmark_dir,
+        benchmark_name=os.path.basename(benchmark_dir),
+        function_name=harness.function_name,
+        success=True,
+        generations_run=num_generations,
+        final_generation=generation,
+        max_fitness=harness.max_fitness,
+        achieved_fitness=fitness,
+        original_lines=original_lines,
+        repaired_variant=variant,
+        weighted_lines=weighted_lines
+    )
+    print(f"\n  Report saved to: {report_path}")
+    return report_path
+
+
+def report_no_repair(benchmark_dir, harness, original_lines, weighted_lines,
+                     best_variant, best_fitness, final_generation, num_generations):
+    """Saves the best attempt and reports a failed repair. Returns the report path."""
+    print("\n" + "=" * 60)
+    print("  Evolution complete. No perfect repair found.")
+    print("=" * 60)
+    print(f"\n  Best fitness achieved: {best_fitness}/{harness.max_fitness}")
+    
+    if best_variant:
+        best_path = os.path.join(benchmark_dir, "best_attempt.py")
+        save_variant_to_file(best_variant.source(original_lines), best_path)
+        print(f"  Best attempt saved to: {best_path}")
+    
+    # Write summary report even for failures
+    report_path = write_summary_report(
+        benchmark_dir=benchmark_dir,
+        benchmark_name=os.path.basename(benchmark_dir),
+        function_name=harness.function_name,
+        success=False,
+        generations_run=num_generations,
+        final_generation=final_generation,
+        max_fitness=harness.max_fitness,
+        achieved_fitness=best_fitness,
+        original_lines=original_lines,
+        repaired_variant=best_variant,
+        weighted_lines=weighted_lines
+    )
+    print(f"  Report saved to: {report_path}")
+    return report_path
+
+
+def evolve_population(benchmark_dir, original_lines, weighted_lines, operator_sites, test_config,
+                      max_fitness, baseline_fitness, num_generations, population_size, verbose=False,
+                      persist_cache=True, num_workers=NUM_WORKERS):
+    """
+    Master-Slave GA: one global population, evaluated by a pool of worker processes.
+    
+    test_config is the harness's parsed tests.json, handed to the workers
+    through shared memory together with the original program.
+    
+    With persist_cache, fitness values are loaded from and saved to the
+    benchmark's FITNESS_CACHE_FILE, so repeated or interrupted runs don't
+    re-evaluate variants they have already seen.
+    
+    Returns:
+        tuple: (success, variant, fitness, generation) - the perfect repair and the
+               generation it was found in, or the best attempt and the last generation
+    """
+    # Step 4: Setup worker pool
+    print("\n[Phase 4] Setting up workspace...")
+    test_data = share_test_data(test_config, original_lines)
+    pool = create_worker_pool(benchmark_dir, test_data.name, num_workers)
+    imap = pool_imap(pool, num_workers)
+    print(f"  Started {num_workers} evaluation workers")
+    
+    # Step 5: Initialize population
+    print("\n[Phase 5] Initializing population...")
+    population = initialize_population(original_lines, weighted_lines, population_size, operator_sites)
+    print(f"  Created {len(population)} variants")
+    
+    # Step 6: The Evolution Loop
+    print(f"\n[Phase 6] Starting Evolution ({num_generations} generations)...")
+    print("-" * 60)
+    
+    # Variant -> fitness, shared across generations (and across runs if persisted)
+    persistent_cache = load_fitness_cache(benchmark_dir) if persist_cache else OrderedDict()
+    if persistent_cache:
+        print(f"  Loaded {len(persistent_cache)} cached fitness values from {FITNESS_CACHE_FILE}")
+    fitness_cache = OrderedDict(persistent_cache)
+    fitness_cache[Variant()] = baseline_fitness  # The original, evaluated at startup
+    best_variant = None  # Only a variant that beats the original
+    best_fitness = baseline_fitness
+    final_generation = 0
+    
+    try:
+        for generation in range(1, num_generations + 1):
+            print(f"\n>>> GENERATION {generation}/{num_generations}")
+            
+            # Evaluate all variants
+            print("  Evaluating fitness...")
+            prune_below = best_fitness
+            scored_population = evaluate_population(
+                population, imap, fitness_cache,
+                verbose=(verbose and generation == 1), prune_below=prune_below
+            )
+            record_persistent_fitness(persistent_cache, scored_population, prune_below, baseline_fitness)
+            if persist_cache and generation % CACHE_SAVE_INTERVAL == 0:
+                save_fitness_cache(benchmark_dir, persistent_cache)
+            
+            # Check for perfect solution
+            for variant, fitness in scored_population:
+                if fitness >= max_fitness:
+                    return True, variant, fitness, generation
+                
+                if fitness > best_fitness:
+                    best_fitness = fitness
+                    best_variant = variant
+            
+            final_generation = generation
+            
+            # Selection
+            survivors, gen_best = select_survivors(scored_population)
+            print(f"  Best fitness: {gen_best}/{max_fitness}")
+            print(f"  Survivors: {len(survivors)}")
+            
+            # Repopulate
+            population = repopulate(survivors, original_lines, weighted_lines, population_size,
+                                    operator_sites)
+    finally:
+        shutdown_worker_pool(pool)
+        release_test_data(test_data)
+        if persist_cache:
+            save_fitness_cache(benchmark_dir, persistent_cache)
+    
+    return False, best_variant, best_fitness, final_generation
+
+
+# === ISLAND MODEL ===
+
+def migrate(scored_population, inbox, outbox):
+    """
+    Sends this island's best individuals to its neighbour and replaces the
+    worst individuals with migrants waiting in the inbox (never blocks).
+    
+    Returns:
+        list of tuples: the scored population after migration
+    """
+    sorted_pop = sorted(scored_population, key=lambda x: x[1], reverse=True)
+    
+    for emigrant in sorted_pop[:MIGRANTS]:
+        outbox.put(emigrant)
+    
+    immigrants = []
+    while len(immigrants) < MIGRANTS:
+        try:
+            immigrants.append(inbox.get_nowait())
+        except queue.Empty:
+            break
+    
+    if immigrants:
+        sorted_pop[-len(immigrants):] = immigrants
+    return sorted_pop
+
+
+def _run_island(island_id, benchmark_dir, original_lines, weighted_lines, operator_sites,
+                max_fitness, baseline_fitness, num_generations, population_size,
+                inbox, outbox, results):
+    """
+    Island process: evolves its own sub-population and migrates every
+    MIGRATION_INTERVAL generations.
+    
+    Posts ("solved", island_id, variant, fitness, generation) as soon as a
+    perfect repair is found, otherwise ("done", island_id, best_variant,
+    best_fitness, generation) when its generations are used up.
+    """
+    # Forked islands inherit the parent's random state; give each its own
+    random.seed()
+    
+    # Migrants may be left unread when the neighbour has already finished
+    outbox.cancel_join_thread()
+    
+    # Islands evaluate in-process, with the same harness setup as a pool worker
+    _init_worker(benchmark_dir)
+    
+    population = initialize_population(original_lines, weighted_lines, population_size, operator_sites)
+    fitness_cache = OrderedDict()
+    fitness_cache[Variant()] = baseline_fitness
+    best_variant = None  # Only a variant that beats the original
+    best_fitness = baseline_fitness
+    
+    for generation in range(1, num_generations + 1):
+        scored_population = evaluate_population(population, map, fitness_cache,
+                                                prune_below=best_fitness)
+        
+        for variant, fitness in scored_population:
+            if fitness >= max_fitness:
+                results.put(("solved", island_id, variant, fitness, generation))
+                return
+            
+            if fitness > best_fitness:
+                best_fitness = fitness
+                best_variant = variant
+        
+        if generation % MIGRATION_INTERVAL == 0:
+            scored_population = migrate(scored_population, inbox, outbox)
+        
+        survivors, gen_best = select_survivors(scored_population)
+        print(f"  [Island {island_id}] Generation {generation}: best fitness {gen_best}/{max_fitness}")
+        
+        population = repopulate(survivors, original_lines, weighted_lines, population_size,
+                                operator_sites)
+    
+    results.put(("done", island_id, best_variant, best_fitness, num_generations))
+
+
+def evolve_islands(benchmark_dir, original_lines, weighted_lines, operator_sites, max_fitness,
+                   baseline_fitness, num_generations, population_size, num_islands):
+    """
+    Island-model GA: num_islands sub-populations evolve in separate processes
+    and exchange their best individuals around a ring every MIGRATION_INTERVAL
+    generations. There is no per-generation global barrier.
+    
+    Returns:
+        tuple: (success, variant, fitness, generation), as evolve_population()
+    """
+    island_size = max(2, population_size // num_islands)
+    
+    print(f"\n[Phase 4] Starting {num_islands} islands...")
+    print(f"  Island population: {island_size}, migration every {MIGRATION_INTERVAL} generations")
+    
+    # Ring topology: island i sends to inbox i+1
+    inboxes = [multiprocessing.Queue() for _ in range(num_islands)]
+    results = multiprocessing.Queue()
+    
+    islands = []
+    for i in range(num_islands):
+        island = multiprocessing.Process(
+            target=_run_island,
+            args=(i, benchmark_dir, original_lines, weighted_lines, operator_sites,
+                  max_fitness, baseline_fitness, num_generations, island_size, inboxes[i],
+                  inboxes[(i + 1) % num_islands], results),
+            daemon=True
+        )
+        island.start()
+        islands.append(island)
+    
+    print(f"\n[Phase 5] Evolving ({num_generations} generations per island)...")
+    print("-" * 60)
+    
+    best = (False, None, baseline_fitness, 0)
+    finished = 0
+    
+    while finished < num_islands:
+        try:
+            status, island_id, variant, fitness, generation = results.get(timeout=1.0)
+        except queue.Empty:
+            if not any(island.is_alive() for island in islands):
+                break  # An island died without reporting
+            continue
+        
+        if status == "solved":
+            print(f"\n  Island {island_id} solved the benchmark in generation {generation}")
+            best = (True, variant, fitness, generation)
+            break
+        
+        finished += 1
+        if fitness > best[2]:
+            best = (False, variant, fitness, generation)
+    
+    # Stop any island still running
+    for island in islands:
+        island.terminate()
+        island.join()
+    
+    return best
+
+
+def run_evolution(benchmark_dir, num_generations, population_size, verbose=False,
+                  num_islands=NUM_ISLANDS, persist_cache=True, num_workers=NUM_WORKERS):
     """
     Main entry point: Runs the complete genetic algorithm loop.
     
@@ -420,6 +1101,10 @@ def run_evolution(benchmark_dir, num_generations, population_size, verbose=False
         num_generations: Number of generations to run
         population_size: Size of the population
         verbose: Enable verbose output
+        num_islands: Sub-populations for the island model (1 = Master-Slave GA)
+        persist_cache: Reuse and update the benchmark's saved fitness cache
+                       (Master-Slave GA only)
+        num_workers: Evaluation processes (Master-Slave GA only)
         
     Returns:
         The repaired variant if found, None otherwise
@@ -452,126 +1137,75 @@ def run_evolution(benchmark_dir, num_generations, population_size, verbose=False
         if weight > 0:
             print(f"    Line {line}: weight = {weight}")
     
-    # Step 4: Setup temp directory
-    print("\n[Phase 4] Setting up workspace...")
-    setup_temp_directory()
-    print(f"  Created: {TEMP_DIR}/")
-    
-    # Step 5: Initialize population
-    print("\n[Phase 5] Initializing population...")
-    population = initialize_population(original_lines, weighted_lines, population_size)
-    print(f"  Created {len(population)} variants")
-    
-    # Step 6: The Evolution Loop
-    print(f"\n[Phase 6] Starting Evolution ({num_generations} generations)...")
-    print("-" * 60)
+    # The unchanged original is evaluated once here, never again during evolution
+    baseline_fitness = harness.evaluate_lines(original_lines)
+    print(f"  Baseline fitness (original program): {baseline_fitness}/{harness.max_fitness}")
     
-    best_variant = None
-    best_fitness = 0.0
-    success = False
-    final_generation = 0
-    repaired_lines = None
+    # Operator positions are taken from the AST once, not re-parsed per mutation
+    operator_sites = find_operator_sites(original_lines)
     
-    for generation in range(1, num_generations + 1):
-        print(f"\n>>> GENERATION {generation}/{num_generations}")
-        
-        # Evaluate all variants
-        print("  Evaluating fitness...")
-        scored_population = evaluate_population(
-            population, harness, verbose=(verbose and generation == 1)
+    # Steps 4-6: Evolve
+    if baseline_fitness >= harness.max_fitness:
+        print("\n  The original program already passes every test.")
+        success, variant, fitness, generation = True, Variant(), baseline_fitness, 0
+    elif num_islands > 1:
+        success, variant, fitness, generation = evolve_islands(
+            benchmark_dir, original_lines, weighted_lines, operator_sites,
+            harness.max_fitness, baseline_fitness, num_generations, population_size, num_islands
         )
-        
-        # Check for perfect solution
-        for variant, fitness in scored_population:
-            if fitness >= harness.max_fitness:
-                print("\n" + "=" * 60)
-                print("  SUCCESS! PERFECT REPAIR FOUND!")
-                print("=" * 60)
-                
-                # Save the winning variant to benchmark folder
-                solution_path = os.path.join(benchmark_dir, "repaired_solution.py")
-                save_variant_to_file(variant, solution_path)
-                print(f"\n  Solution saved to: {solution_path}")
-                print(f"  Fitness: {fitness}/{harness.max_fitness}")
-                print(f"  Generation: {generation}")
-                
-                # Find and display the changes
-                changes = find_changed_lines(original_lines, variant)
-                if changes:
-                    print(f"\n  Code changes ({len(changes)} lines modified):")
-                    for line_num, before, after in changes:
-                        print(f"    Line {line_num}:")
-                        print(f"      BEFORE: {before}")
-                        print(f"      AFTER:  {after}")
-                
-                # Write summary report
-                report_path = write_summary_report(
-                    benchmark_dir=benchmark_dir,
-                    benchmark_name=benchmark_name,
-                    function_name=harness.function_name,
-                    success=True,
-                    generations_run=num_generations,
-                    final_generation=generation,
-                    max_fitness=harness.max_fitness,
-                    achieved_fitness=fitness,
-                    original_lines=original_lines,
-                    repaired_lines=variant,
-                    weighted_lines=weighted_lines
-                )
-                print(f"\n  Report saved to: {report_path}")
-                
-                cleanup_temp_directory()
-                return variant
-            
-            if fitness > best_fitness:
-                best_fitness = fitness
-                best_variant = variant[:]
-        
-        final_generation = generation
-        
-        # Selection
-        survivors, gen_best = select_survivors(scored_population)
-        print(f"  Best fitness: {gen_best}/{harness.max_fitness}")
-        print(f"  Survivors: {len(survivors)}")
-        
-        # Repopulate
-        population = repopulate(survivors, weighted_lines, population_size)
+    else:
+        success, variant, fitness, generation = evolve_population(
+            benchmark_dir, original_lines, weighted_lines, operator_sites, harness.config,
+            harness.max_fitness, baseline_fitness, num_generations, population_size, verbose,
+            persist_cache, num_workers
+        )
+    
+    if success:
+        report_repair(benchmark_dir, harness, original_lines, weighted_lines,
+                      variant, fitness, generation, num_generations)
+        return variant
     
     # Evolution complete without perfect solution
-    print("\n" + "=" * 60)
-    print("  Evolution complete. No perfect repair found.")
-    print("=" * 60)
-    print(f"\n  Best fitness achieved: {best_fitness}/{harness.max_fitness}")
+    report_no_repair(benchmark_dir, harness, original_lines, weighted_lines,
+                     variant, fitness, generation, num_generations)
+    return None
+
+
+def run_benchmark(benchmark_name, num_generations=NUM_GENERATIONS, population_size=POPULATION_SIZE,
+                  num_workers=NUM_WORKERS):
+    """
+    Runs the repair on one benchmark in the current process, capturing its console output.
     
-    if best_variant:
-        best_path = os.path.join(benchmark_dir, "best_attempt.py")
-        save_variant_to_file(best_variant, best_path)
-        print(f"  Best attempt saved to: {best_path}")
+    Meant for scripts that run many benchmarks (see test_all_benchmarks.py):
+    unlike starting `python evolution.py` per benchmark, the interpreter,
+    imports and content-keyed caches (e.g. syntax checks) are reused.
+    Scripts running several benchmarks at once should share the CPUs out
+    through num_workers.
     
-    # Write summary report even for failures
-    report_path = write_summary_report(
-        benchmark_dir=benchmark_dir,
-        benchmark_name=benchmark_name,
-        function_name=harness.function_name,
-        success=False,
-        generations_run=num_generations,
-        final_generation=final_generation,
-        max_fitness=harness.max_fitness,
-        achieved_fitness=best_fitness,
-        original_lines=original_lines,
-        repaired_lines=best_variant,
-        weighted_lines=weighted_lines
-    )
-    print(f"  Report saved to: {report_path}")
+    Returns:
+        tuple: (success, stdout) - whether a perfect repair was found, and the printed output
+    """
+    benchmark_dir = resolve_benchmark_path(benchmark_name)
     
-    cleanup_temp_directory()
-    return None
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        repaired = run_evolution(benchmark_dir, num_generations, population_size,
+                                 num_workers=num_workers)
+        
+    # Worker processes of a benchmark runner don't run atexit hooks
+    save_syntax_cache()
+    
+    return repaired is not None, output.getvalue()
 
 
 def main():
     """Main entry point."""
     args = parse_args()
     
+    # Individual mutations are only reported in verbose mode
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, format="%(message)s",
+                        stream=sys.stdout)
+    
     try:
         benchmark_dir = resolve_benchmark_path(args.benchmark)
     except FileNotFoundError as e:
@@ -582,7 +1216,9 @@ def main():
         benchmark_dir=benchmark_dir,
         num_generations=args.generations,
         population_size=args.population,
-        verbose=args.verbose
+        verbose=args.verbose,
+        num_islands=args.islands,
+        persist_cache=not args.no_cache
     )
 
 
@@ -1,7 +1,5 @@
-import sys
-import os
 import patient
-from test_harness import POSITIVE_TESTS, NEGATIVE_TESTS
+from test_harness import POSITIVE_TESTS, NEGATIVE_TESTS, call_with_coverage
 
 # We need to track which lines in patient.py are executed.
 # We'll stick to the strict definitions from the Task 03 PDF.
@@ -10,35 +8,22 @@ def get_coverage(func, arg):
     """
     Runs the function 'func' with argument 'arg' with tracing enabled.
     Returns a set of line numbers executed in 'patient.py'.
-    """
-    covered_lines = set()
     
-    # We need the absolute path to filter correctly
-    patient_file = os.path.abspath(patient.__file__)
+    Uses the harness's call_with_coverage (sys.monitoring on Python 3.12+,
+    a sys.settrace tracer on older interpreters).
+    """
+    # The name patient.py's code was compiled with (co_filename)
+    patient_file = patient.__file__
     # Handle .pyc or similar extensions just in case (though usually __file__ is .py)
     if patient_file.endswith(".pyc"): 
         patient_file = patient_file[:-1]
         
-    def trace_func(frame, event, arg):
-        if event == 'line':
-            # Check if this frame is executing code in patient.py
-            # frame.f_code.co_filename usually returns absolute path
-            code_path = os.path.abspath(frame.f_code.co_filename)
-            if code_path == patient_file:
-                covered_lines.add(frame.f_lineno)
-        return trace_func
-
-    # Start tracing
-    sys.settrace(trace_func)
+    covered_lines = set()
     try:
-        func(arg)
+        call_with_coverage(func, (arg,), patient_file, covered_lines)
     except Exception:
         # We expect exceptions might happen in buggy code, we still want coverage
         pass
-    finally:
-        # Stop tracing
-        sys.settrace(None)
-        
     return covered_lines
 
 def run_localization():
@@ -1,19 +1,28 @@
 """
 Test All Benchmarks - Verification Script
 
-This script runs all 5 benchmarks to verify they work correctly.
+This script runs all benchmarks (in parallel) to verify they work correctly.
 Use this before final submission to ensure everything is working.
 
 Usage:
     python test_all_benchmarks.py
 """
 
-import subprocess
+import _thread
+import contextlib
+import io
 import sys
 import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from evolution import run_benchmark
 
 BENCHMARKS = ['benchmark1', 'benchmark2', 'benchmark3', 'benchmark4', 'benchmark5', 'benchmark6']
 GENERATIONS = 15  # Quick test with fewer generations
+TIMEOUT = 180  # 3 minute timeout per benchmark
+MAX_PARALLEL = min(len(BENCHMARKS), os.cpu_count() or 1)  # Benchmarks run at the same time
+WORKERS_PER_BENCHMARK = max(1, (os.cpu_count() or 1) // MAX_PARALLEL)  # CPUs shared out between them
 
 def test_benchmark(benchmark_name):
     """Test a single benchmark and return success status."""
@@ -21,28 +30,37 @@ def test_benchmark(benchmark_name):
     print(f"Testing {benchmark_name}...")
     print(f"{'='*60}")
     
+    # Evolution runs in this process; the timer interrupts it like Ctrl+C
+    timed_out = threading.Event()
+    
+    def interrupt():
+        timed_out.set()
+        _thread.interrupt_main()
+    
+    timer = threading.Timer(TIMEOUT, interrupt)
+    timer.start()
+    
     try:
-        result = subprocess.run(
-            ['python', 'evolution.py', benchmark_name, '--generations', str(GENERATIONS)],
-            capture_output=True,
-            text=True,
-            timeout=180  # 3 minute timeout
-        )
+        success, output = run_benchmark(benchmark_name, GENERATIONS, num_workers=WORKERS_PER_BENCHMARK)
         
         # Check if solution was found
-        if 'SUCCESS! PERFECT REPAIR FOUND!' in result.stdout:
+        if success:
             print(f"✅ {benchmark_name}: PASSED - Repair found")
             return True
         else:
             print(f"⚠️  {benchmark_name}: No perfect repair (may need more generations)")
             return False
             
-    except subprocess.TimeoutExpired:
+    except KeyboardInterrupt:
+        if not timed_out.is_set():
+            raise
         print(f"❌ {benchmark_name}: FAILED - Timeout")
         return False
     except Exception as e:
         print(f"❌ {benchmark_name}: FAILED - {e}")
         return False
+    finally:
+        timer.cancel()
 
 
 def verify_output_files(benchmark_name):
@@ -50,11 +68,14 @@ def verify_output_files(benchmark_name):
     benchmark_dir = os.path.join('benchmarks', benchmark_name)
     
     required_files = ['patient.py', 'tests.json', 'repaired_solution.py', 'report_summary.txt']
-    missing = []
     
-    for file in required_files:
-        if not os.path.exists(os.path.join(benchmark_dir, file)):
-            missing.append(file)
+    # One directory listing instead of a stat() per file
+    try:
+        with os.scandir(benchmark_dir) as entries:
+            present = {entry.name for entry in entries if entry.is_file()}
+    except OSError:
+        present = set()
+    missing = [file for file in required_files if file not in present]
     
     if missing:
         print(f"   Missing files: {', '.join(missing)}")
@@ -62,26 +83,47 @@ def verify_output_files(benchmark_name):
     return True
 
 
-def main():
-    """Run all benchmarks and report results."""
-    print("="*60)
-    print("  AUTOMATED PROGRAM REPAIR - BENCHMARK VERIFICATION")
-    print("="*60)
-    print(f"\nTesting {len(BENCHMARKS)} benchmarks with {GENERATIONS} generations each...")
+def check_benchmark(benchmark_name):
+    """
+    Tests a benchmark and verifies its output files in a worker process.
     
-    results = {}
+    Output is captured and returned so results of parallel benchmarks don't interleave.
     
-    for benchmark in BENCHMARKS:
-        success = test_benchmark(benchmark)
-        results[benchmark] = success
+    Returns:
+        tuple: (benchmark_name, success, output)
+    """
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        success = test_benchmark(benchmark_name)
         
         # Verify output files
         if success:
-            files_ok = verify_output_files(benchmark)
+            files_ok = verify_output_files(benchmark_name)
             if files_ok:
                 print(f"   Output files: OK")
             else:
-                results[benchmark] = False
+                success = False
+                
+    return benchmark_name, success, output.getvalue()
+
+
+def main():
+    """Run all benchmarks and report results."""
+    print("="*60)
+    print("  AUTOMATED PROGRAM REPAIR - BENCHMARK VERIFICATION")
+    print("="*60)
+    print(f"\nTesting {len(BENCHMARKS)} benchmarks with {GENERATIONS} generations each "
+          f"({MAX_PARALLEL} at a time)...")
+    
+    results = {benchmark: False for benchmark in BENCHMARKS}
+    
+    # Benchmarks are independent: run them in parallel, print each as it finishes
+    with ProcessPoolExecutor(max_workers=MAX_PARALLEL) as executor:
+        futures = [executor.submit(check_benchmark, benchmark) for benchmark in BENCHMARKS]
+        for future in as_completed(futures):
+            benchmark, success, output = future.result()
+            results[benchmark] = success
+            print(output, end="")
     
     # Summary
     print(f"\n{'='*60}")
@@ -5,17 +5,175 @@ This module provides dynamic test loading and execution for any benchmark.
 Tests are loaded from JSON files, allowing the tool to work with arbitrary programs.
 """
 
+import ast
+import builtins
+import copy
+import functools
 import json
 import os
+import pickle
+import queue
+import signal
 import sys
-import importlib.util
+import hashlib
+import types
 import concurrent.futures
 import threading
+import time
+from collections import OrderedDict
 
 # Timeout for individual test execution (seconds)
 # Prevents infinite loops from hanging the tool
 TEST_TIMEOUT = 2.0
 
+# Time out test calls with SIGALRM instead of a thread where possible (Unix, main thread)
+USE_SIGALRM = hasattr(signal, "setitimer")
+
+# Max compiled variant code objects (and imported variant modules) kept per harness (LRU)
+CODE_CACHE_SIZE = 1024
+
+# Max remembered variant fitnesses per harness, keyed by a hash of the source (LRU)
+FITNESS_CACHE_SIZE = 4096
+
+# Max remembered single test outcomes per harness, keyed by (source hash, case index) (LRU)
+CASE_CACHE_SIZE = 16384
+
+
+def _load_tests_cached(path, mtime_ns, size):
+    """
+    Parses a tests.json file once per version of it.
+    
+    The modification time and size in the key make an edited file load
+    again. Every call gets its own copy of the dict, unpickled from bytes
+    kept by _tests_blob() (faster than parsing the JSON again), so a harness
+    changing its config can't affect another one.
+    """
+    return pickle.loads(_tests_blob(path, mtime_ns, size))
+
+
+@functools.lru_cache(maxsize=64)
+def _tests_blob(path, mtime_ns, size):
+    """The parsed tests.json file for _load_tests_cached(), pickled."""
+    with open(path, 'r') as f:
+        return pickle.dumps(json.load(f), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+# Debug line printed per test case, keyed by the status from case_status()
+CASE_REPORTS = {
+    "PASS": "    [{tag} PASS] Input: {inputs}, Expected: {expected}, Got: {result}",
+    "FAIL": "    [{tag} FAIL] Input: {inputs}, Expected: {expected}, Got: {result}",
+    "TIMEOUT": "    [{tag} TIMEOUT] Input: {inputs}, Error: {result}",
+    "ERROR": "    [{tag} ERROR] Input: {inputs}, Error: {result}",
+}
+
+
+def case_status(success, result, expected):
+    """
+    Classifies one test call.
+    
+    Args:
+        success: False if the call timed out or raised
+        result: The call's return value, or the error message
+        expected: The expected return value
+        
+    Returns:
+        tuple: (status, detail), status being a CASE_REPORTS key and detail the
+               result, or the exception if comparing it with expected failed
+    """
+    if not success:
+        return "TIMEOUT", result
+    try:
+        return ("PASS" if result == expected else "FAIL"), result
+    except Exception as e:
+        return "ERROR", e
+
+
+class TestTimeout(BaseException):
+    """Raised inside a test call by the SIGALRM timer (see _run_batch_with_sigalrm)."""
+
+
+def may_catch_timeout(source):
+    """
+    Tells whether variant source could stop a TestTimeout from propagating.
+    
+    That is any except clause that isn't limited to built-in Exception
+    subclasses (a bare except, BaseException, a name the variant defines...)
+    and any finally block with a return, break or continue, which drops the
+    exception in flight. Such a variant could catch every alarm and never
+    return, so its tests run on the test thread instead.
+    
+    Args:
+        source: The variant's source code (str or bytes)
+        
+    Returns:
+        bool: True if the source has such a construct (False if it doesn't parse)
+    """
+    keywords = (b"except", b"finally") if isinstance(source, bytes) else ("except", "finally")
+    if not any(keyword in source for keyword in keywords):
+        return False
+    try:
+        tree = ast.parse(source)
+    except SyntaxError:
+        return False
+        
+    def catches_exceptions_only(node):
+        if isinstance(node, ast.Tuple):
+            return all(catches_exceptions_only(elt) for elt in node.elts)
+        if not isinstance(node, ast.Name):
+            return False
+        value = getattr(builtins, node.id, None)
+        return isinstance(value, type) and issubclass(value, Exception)
+        
+    for node in ast.walk(tree):
+        if isinstance(node, ast.ExceptHandler):
+            if node.type is None or not catches_exceptions_only(node.type):
+                return True
+        elif getattr(node, "finalbody", None):
+            for stmt in node.finalbody:
+                for inner in ast.walk(stmt):
+                    if isinstance(inner, (ast.Return, ast.Break, ast.Continue)):
+                        return True
+    return False
+
+
+class TestThread:
+    """
+    A one-thread executor (submit/shutdown, as ThreadPoolExecutor) on a daemon thread.
+    
+    ThreadPoolExecutor joins its threads at interpreter exit, so one stuck in
+    an endless variant call would keep the process alive for good. A daemon
+    thread is dropped at exit instead.
+    """
+    
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+        threading.Thread(target=self._work, name="apr-test-thread", daemon=True).start()
+        
+    def submit(self, func, *args):
+        """Queues func(*args); returns its concurrent.futures.Future."""
+        future = concurrent.futures.Future()
+        self._queue.put((future, func, args))
+        return future
+        
+    def shutdown(self):
+        """Stops the thread once it is done with the calls already queued (doesn't wait)."""
+        self._queue.put(None)
+        
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            future, func, args = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = func(*args)
+            except BaseException as e:
+                future.set_exception(e)
+            else:
+                future.set_result(result)
+
 
 class TestHarness:
     """
@@ -26,28 +184,61 @@ class TestHarness:
         fitness = harness.evaluate_file("temp_variant.py")
     """
     
-    def __init__(self, benchmark_dir):
+    def __init__(self, benchmark_dir, config=None):
         """
         Initialize the test harness for a specific benchmark.
         
         Args:
             benchmark_dir: Path to the benchmark directory containing patient.py and tests.json
+            config: Already parsed tests.json contents (see self.config); read from disk if None
         """
         self.benchmark_dir = os.path.abspath(benchmark_dir)
         self.patient_path = os.path.join(self.benchmark_dir, "patient.py")
         self.tests_path = os.path.join(self.benchmark_dir, "tests.json")
         
+        # Compiled variant code, keyed by a hash of its source
+        self._code_cache = OrderedDict()
+        
+        # Imported variant files (evaluate_file), keyed the same way
+        self._module_cache = OrderedDict()
+        
+        # Final fitness of every fully evaluated source, keyed the same way
+        self._fitness_cache = OrderedDict()
+        
+        # Pass/fail of single test cases, kept even when a run was pruned
+        self._case_cache = OrderedDict()
+        
+        # Whether a source may catch TestTimeout (see may_catch_timeout), keyed the same way
+        self._catches_timeout = OrderedDict()
+        
+        # Keys of sources that don't compile (fitness 0.0 whatever prune_below is)
+        self._syntax_errors = OrderedDict()
+        
+        # Template namespace that every in-memory variant is executed into a copy of
+        self._base_namespace = {"__name__": "variant", "__builtins__": builtins}
+        
+        # Worker thread the tests run on, kept for the harness's lifetime (see _get_executor)
+        self._executor = None
+        
+        # Lines covered by each positive/negative test in the last evaluate_file()
+        # run with collect_coverage=True (used by run_fault_localization)
+        self._cov_pos = []
+        self._cov_neg = []
+        
         # Load test configuration
-        self._load_tests()
+        self._load_tests(config)
         
-    def _load_tests(self):
-        """Load test cases from the JSON file."""
-        if not os.path.exists(self.tests_path):
-            raise FileNotFoundError(f"Tests file not found: {self.tests_path}")
-            
-        with open(self.tests_path, 'r') as f:
-            config = json.load(f)
-            
+    def _load_tests(self, config=None):
+        """Load test cases from the JSON file, unless the parsed config is given."""
+        if config is None:
+            if not os.path.exists(self.tests_path):
+                raise FileNotFoundError(f"Tests file not found: {self.tests_path}")
+                
+            stat = os.stat(self.tests_path)
+            config = _load_tests_cached(self.tests_path, stat.st_mtime_ns, stat.st_size)
+                
+        # Parsed tests.json, so other processes can build a harness without re-reading it
+        self.config = config
         self.function_name = config["function_name"]
         self.max_fitness = config["max_fitness"]
         
@@ -57,6 +248,32 @@ class TestHarness:
         self.negative_tests = config["negative_tests"]["cases"]
         self.negative_weight = config["negative_tests"]["weight"]
         
+        # Flat case table shared by every variant, with the test dicts unpacked
+        # once: (tag, weight, inputs, expected, copiers)
+        # Heaviest tests run first (normally the negative ones), so a variant that
+        # fails them is pruned after as few calls as possible; ties keep NEG first
+        self._cases = sorted(
+            [self._prepare_case("NEG", self.negative_weight, test) for test in self.negative_tests] +
+            [self._prepare_case("POS", self.positive_weight, test) for test in self.positive_tests],
+            key=lambda case: -case[1],
+        )
+        self._cases_fitness = sum(case[1] for case in self._cases)
+        
+    def _prepare_case(self, tag, weight, test):
+        """
+        Builds a self._cases entry from a tests.json case.
+        
+        copiers says how each argument is copied per call, decided once (see
+        input_copiers); it holds the exception instead if that failed, so the
+        case fails when run like a case whose inputs can't be copied.
+        """
+        inputs = test["input"]
+        try:
+            copiers = input_copiers(inputs)
+        except Exception as e:
+            copiers = e
+        return (tag, weight, inputs, test["expected"], copiers)
+        
     def get_patient_path(self):
         """Returns the path to the buggy program."""
         return self.patient_path
@@ -68,13 +285,18 @@ class TestHarness:
             "negative": (self.negative_tests, self.negative_weight)
         }
         
-    def evaluate_file(self, filepath, debug=False):
+    def evaluate_file(self, filepath, debug=False, prune_below=0.0, collect_coverage=False):
         """
         Evaluate a variant file against all test cases.
         
         Args:
             filepath: Path to the Python file to test
             debug: If True, print detailed test results
+            prune_below: Stop as soon as the variant can no longer reach this fitness
+                         (the partial fitness returned is then below prune_below)
+            collect_coverage: If True, run every test (no caches, no pruning) with
+                              line tracing, and leave each test's covered lines
+                              in self._cov_pos / self._cov_neg
             
         Returns:
             float: The fitness score
@@ -82,17 +304,28 @@ class TestHarness:
         fitness = 0.0
         abs_filepath = os.path.abspath(filepath)
         
+        # Identical variants come up again and again during the search
         try:
-            # Load the module dynamically with unique name
-            module_name = f"variant_{os.path.basename(filepath).replace('.py', '')}_{id(self)}"
-            
-            if module_name in sys.modules:
-                del sys.modules[module_name]
-                
-            spec = importlib.util.spec_from_file_location(module_name, abs_filepath)
-            module = importlib.util.module_from_spec(spec)
-            sys.modules[module_name] = module
-            spec.loader.exec_module(module)
+            with open(abs_filepath, 'rb') as f:
+                source = f.read()
+            key = self._source_key(source)
+        except OSError as e:
+            if debug:
+                print(f"    [LOAD ERROR] {e}")
+            return 0.0
+        coverage = None
+        if collect_coverage:
+            coverage = [set() for case in self._cases]
+            self._cov_pos = [lines for lines, case in zip(coverage, self._cases) if case[0] == "POS"]
+            self._cov_neg = [lines for lines, case in zip(coverage, self._cases) if case[0] == "NEG"]
+            prune_below = 0.0
+        else:
+            cached = self._cached_fitness(key, debug)
+            if cached is not None:
+                return cached
+        
+        try:
+            module = self._load_variant_module(abs_filepath, source, key)
             
             # Get the function to test
             if not hasattr(module, self.function_name):
@@ -101,91 +334,407 @@ class TestHarness:
                 return 0.0
                 
             func = getattr(module, self.function_name)
-            
-            # Run positive tests
-            for test in self.positive_tests:
-                try:
-                    # Deep copy inputs to avoid mutation
-                    inputs = self._deep_copy_inputs(test["input"])
-                    
-                    # Run with timeout to catch infinite loops
-                    success, result = self._run_with_timeout(func, inputs)
-                    expected = test["expected"]
-                    
-                    if not success:
-                        if debug:
-                            print(f"    [POS TIMEOUT] Input: {test['input']}, Error: {result}")
-                        continue
-                    
-                    if result == expected:
-                        fitness += self.positive_weight
-                        if debug:
-                            print(f"    [POS PASS] Input: {test['input']}, Expected: {expected}, Got: {result}")
-                    elif debug:
-                        print(f"    [POS FAIL] Input: {test['input']}, Expected: {expected}, Got: {result}")
-                except Exception as e:
-                    if debug:
-                        print(f"    [POS ERROR] Input: {test['input']}, Error: {e}")
-                        
-            # Run negative tests
-            for test in self.negative_tests:
-                try:
-                    inputs = self._deep_copy_inputs(test["input"])
-                    
-                    # Run with timeout to catch infinite loops
-                    success, result = self._run_with_timeout(func, inputs)
-                    expected = test["expected"]
-                    
-                    if not success:
-                        if debug:
-                            print(f"    [NEG TIMEOUT] Input: {test['input']}, Error: {result}")
-                        continue
-                    
-                    if result == expected:
-                        fitness += self.negative_weight
-                        if debug:
-                            print(f"    [NEG PASS] Input: {test['input']}, Expected: {expected}, Got: {result}")
-                    elif debug:
-                        print(f"    [NEG FAIL] Input: {test['input']}, Expected: {expected}, Got: {result}")
-                except Exception as e:
-                    if debug:
-                        print(f"    [NEG ERROR] Input: {test['input']}, Error: {e}")
+            fitness = self._run_tests(func, debug, prune_below, key, coverage,
+                                      self._may_catch_timeout(key, source))
                         
         except SyntaxError as e:
+            self._remember_syntax_error(key)
             if debug:
                 print(f"    [SYNTAX ERROR] {e}")
         except Exception as e:
             if debug:
                 print(f"    [LOAD ERROR] {e}")
                 
+        self._store_fitness(key, fitness, prune_below)
         return fitness
         
-    def _deep_copy_inputs(self, inputs):
-        """Create deep copies of input arguments to avoid mutation."""
-        import copy
-        return [copy.deepcopy(arg) for arg in inputs]
-    
-    def _run_with_timeout(self, func, args, timeout=TEST_TIMEOUT):
+    def evaluate_lines(self, lines, debug=False, prune_below=0.0):
         """
-        Run a function with a timeout to prevent infinite loops.
+        Evaluate a variant held in memory (list of source lines) against all test cases.
+        
+        The source is compiled and executed into a copy of a prebuilt template
+        namespace, avoiding the temp file write and the import machinery of
+        evaluate_file().
         
         Args:
-            func: The function to call
-            args: Arguments to pass (as a list)
-            timeout: Maximum seconds to wait
+            lines: The variant's source code as a list of lines
+            debug: If True, print detailed test results
+            prune_below: Stop as soon as the variant can no longer reach this fitness
+            
+        Returns:
+            float: The fitness score
+        """
+        fitness = 0.0
+        source = "".join(lines)
+        key = self._source_key(source.encode())
+        cached = self._cached_fitness(key, debug)
+        if cached is not None:
+            return cached
+        
+        try:
+            code_obj = self._compile_variant(source, key)
+            namespace = self._base_namespace.copy()
+            exec(code_obj, namespace)
+            
+            # Get the function to test
+            if self.function_name not in namespace:
+                if debug:
+                    print(f"    [ERROR] Function '{self.function_name}' not found in module")
+                return 0.0
+                
+            fitness = self._run_tests(namespace[self.function_name], debug, prune_below, key,
+                                      catches_timeout=self._may_catch_timeout(key, source))
+            
+        except SyntaxError as e:
+            self._remember_syntax_error(key)
+            if debug:
+                print(f"    [SYNTAX ERROR] {e}")
+        except Exception as e:
+            if debug:
+                print(f"    [LOAD ERROR] {e}")
+                
+        self._store_fitness(key, fitness, prune_below)
+        return fitness
+        
+    def _load_variant_module(self, abs_filepath, source, key):
+        """
+        Import a variant file, reusing the module of an identical earlier variant.
+        
+        The source is compiled and executed straight into a new module object,
+        skipping importlib's spec/loader layers and their filesystem calls.
+        Nothing imports variants by name, so they are not registered in
+        sys.modules: an evicted module is freed along with its cache entry.
+        
+        Args:
+            abs_filepath: Absolute path of the file (used as the code's filename,
+                          which coverage tracing relies on)
+            source: The file's contents (bytes)
+            key: _source_key() of the source
+        
+        Raises:
+            SyntaxError/Exception: If the module fails to import (never cached)
+        """
+        module = self._module_cache.get(key)
+        if module is not None:
+            self._module_cache.move_to_end(key)
+            return module
+            
+        module_name = f"variant_{key.hex()}"
+        code_obj = compile(source, abs_filepath, "exec")
+        module = types.ModuleType(module_name)
+        module.__file__ = abs_filepath
+        exec(code_obj, module.__dict__)
+        
+        self._module_cache[key] = module
+        if len(self._module_cache) > CODE_CACHE_SIZE:
+            self._module_cache.popitem(last=False)
+        return module
+        
+    def _source_key(self, source_bytes):
+        """Cache key of a variant: a 16-byte digest of its source."""
+        return hashlib.blake2b(source_bytes, digest_size=16).digest()
+        
+    def _cached_fitness(self, key, debug=False):
+        """Returns the remembered fitness for a source key, or None (always None when debugging)."""
+        if key is None or debug:
+            return None
+        if key in self._syntax_errors:
+            self._syntax_errors.move_to_end(key)
+            return 0.0
+        fitness = self._fitness_cache.get(key)
+        if fitness is not None:
+            self._fitness_cache.move_to_end(key)
+        return fitness
+        
+    def _remember_syntax_error(self, key):
+        """
+        Remembers a source that failed to compile.
+        
+        Unlike _store_fitness(), this holds whatever prune_below was, so a
+        broken variant that comes up again is never parsed again.
+        """
+        if key is None:
+            return
+        self._syntax_errors[key] = True
+        if len(self._syntax_errors) > FITNESS_CACHE_SIZE:
+            self._syntax_errors.popitem(last=False)
+        
+    def _store_fitness(self, key, fitness, prune_below=0.0):
+        """
+        Remembers the fitness of a fully evaluated source.
+        
+        Only final results are kept: a fitness below prune_below may be the
+        partial score of a pruned run, so it is not cached.
+        """
+        if key is None or fitness < prune_below:
+            return
+        self._fitness_cache[key] = fitness
+        if len(self._fitness_cache) > FITNESS_CACHE_SIZE:
+            self._fitness_cache.popitem(last=False)
+        
+    def _compile_variant(self, source, key=None):
+        """
+        Compile variant source, reusing the code object of an identical earlier variant.
+        
+        Args:
+            source: The variant's source code
+            key: Its _source_key(), if already computed
+        
+        Raises:
+            SyntaxError: If the source does not compile (never cached)
+        """
+        if key is None:
+            key = self._source_key(source.encode())
+        
+        code_obj = self._code_cache.get(key)
+        if code_obj is not None:
+            self._code_cache.move_to_end(key)
+            return code_obj
             
+        code_obj = compile(source, "<variant>", "exec")
+        self._code_cache[key] = code_obj
+        if len(self._code_cache) > CODE_CACHE_SIZE:
+            self._code_cache.popitem(last=False)
+        return code_obj
+        
+    def _may_catch_timeout(self, key, source):
+        """may_catch_timeout() of a source, remembered by its key."""
+        catches = self._catches_timeout.get(key)
+        if catches is not None:
+            self._catches_timeout.move_to_end(key)
+            return catches
+        catches = may_catch_timeout(source)
+        self._catches_timeout[key] = catches
+        if len(self._catches_timeout) > CODE_CACHE_SIZE:
+            self._catches_timeout.popitem(last=False)
+        return catches
+        
+    def _run_tests(self, func, debug=False, prune_below=0.0, key=None, coverage=None,
+                   catches_timeout=False):
+        """
+        Run all positive and negative tests against a loaded function.
+        
+        Stops early once the fitness so far plus the weight of the tests still
+        to run falls below prune_below.
+        
+        Args:
+            func: The function under test
+            debug: If True, print detailed test results
+            prune_below: Stop as soon as the variant can no longer reach this fitness
+            key: _source_key() of the variant; cases this source already answered
+                 (e.g. in an earlier pruned run) are not run again
+            coverage: Optional list with one set per case of self._cases; every
+                      case is then run with line tracing into its set
+            catches_timeout: True if the variant may catch TestTimeout, so SIGALRM
+                             can't be relied on to stop it (see may_catch_timeout)
+        
         Returns:
-            tuple: (success, result_or_error)
+            float: The fitness score
         """
-        with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-            future = executor.submit(func, *args)
+        fitness = 0.0
+        remaining = self._cases_fitness
+        
+        # Outcomes already known for this source (never used when debugging,
+        # since the cache keeps only pass/fail)
+        known = {}
+        if key is not None and not debug and coverage is None:
+            for i in range(len(self._cases)):
+                passed = self._case_cache.get((key, i))
+                if passed is not None:
+                    self._case_cache.move_to_end((key, i))
+                    known[i] = passed
+        
+        # Copy inputs to avoid mutation (only the ones a test could change)
+        batch = []
+        for i in range(len(self._cases)):
+            if i in known:
+                continue
             try:
-                result = future.result(timeout=timeout)
-                return (True, result)
-            except concurrent.futures.TimeoutError:
-                return (False, "Timeout")
+                args = self._copy_case_inputs(i)
+                # Traced calls also carry their case index (see traced_call below)
+                batch.append(args if coverage is None else [i] + args)
             except Exception as e:
-                return (False, str(e))
+                batch.append(e)
+                
+        if coverage is not None:
+            # Tracing is per thread, so it is switched on by the test thread itself
+            def traced_call(index, *args, _func=func):
+                return call_with_coverage(_func, args, self.patient_path, coverage[index])
+            func = traced_call
+            
+        if (USE_SIGALRM and not catches_timeout
+                and threading.current_thread() is threading.main_thread()):
+            outcomes = self._run_batch_with_sigalrm(func, batch)
+        else:
+            outcomes = self._run_batch_with_timeout(func, batch)
+        
+        try:
+            for i, (tag, weight, inputs, expected, copiers) in enumerate(self._cases):
+                if fitness + remaining < prune_below:
+                    if debug:
+                        print(f"    [PRUNED] Fitness {fitness} + {remaining} remaining < {prune_below}")
+                    break
+                remaining -= weight
+                
+                if i in known:
+                    if known[i]:
+                        fitness += weight
+                    continue
+                
+                success, result = next(outcomes)
+                status, result = case_status(success, result, expected)
+                passed = status == "PASS"
+                if passed:
+                    fitness += weight
+                self._store_case(key, i, passed)
+                
+                if debug:
+                    print(CASE_REPORTS[status].format(tag=tag, inputs=inputs, expected=expected, result=result))
+        finally:
+            # Cancels the calls still queued when pruned
+            outcomes.close()
+                    
+        return fitness
+        
+    def _store_case(self, key, index, passed):
+        """Remembers whether the source with this key passed test case 'index'."""
+        if key is None:
+            return
+        self._case_cache[(key, index)] = passed
+        if len(self._case_cache) > CASE_CACHE_SIZE:
+            self._case_cache.popitem(last=False)
+        
+    def _copy_case_inputs(self, index):
+        """Fresh arguments for test case 'index' of self._cases, copied as cheaply as is safe."""
+        tag, weight, inputs, expected, copiers = self._cases[index]
+        if isinstance(copiers, Exception):
+            raise copiers
+        return [arg if copier is None else copier(arg) for copier, arg in zip(copiers, inputs)]
+        
+    def _get_executor(self):
+        """
+        Returns the harness's single test thread, starting it on first use.
+        
+        The same thread runs the tests of every variant. Only a call that
+        times out costs a new one: its thread is abandoned (a Python thread
+        can't be killed) and the next batch starts a fresh executor.
+        """
+        if self._executor is None:
+            self._executor = TestThread()
+        return self._executor
+        
+    def _abandon_executor(self, futures=()):
+        """
+        Drops a test thread that is stuck in a call, along with the calls queued behind it.
+        
+        Args:
+            futures: The batch's futures; those not started yet are cancelled
+        """
+        for future in futures:
+            if future is not None:
+                future.cancel()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        
+    def _run_batch_with_sigalrm(self, func, batch, timeout=TEST_TIMEOUT):
+        """
+        Same as _run_batch_with_timeout(), timing calls out with SIGALRM (Unix).
+        
+        The calls run on the current thread, which must be the main thread
+        (only it receives signals). A timer interrupts a call that runs too
+        long by raising TestTimeout in it, so nothing is left running: no
+        thread is abandoned. TestTimeout is a BaseException, so variant code
+        catching Exception can't swallow it. The timer keeps firing every
+        tenth of the timeout until the call returns, in case one alarm is
+        caught anyway; variants that could catch every one of them are run
+        by _run_batch_with_timeout() instead (see may_catch_timeout).
+        
+        A timer and SIGALRM handler the caller had set are put back afterwards,
+        the timer less the time the batch took (it fires at once if it ran out).
+        """
+        armed = False
+        
+        def on_alarm(signum, frame):
+            # A late alarm after the call returned must not hit the harness
+            if armed:
+                raise TestTimeout()
+            
+        # Disarms the caller's timer so it can't fire into on_alarm
+        outer_delay, outer_interval = signal.setitimer(signal.ITIMER_REAL, 0)
+        started = time.monotonic()
+        previous = signal.signal(signal.SIGALRM, on_alarm)
+        try:
+            for args in batch:
+                if isinstance(args, Exception):
+                    yield (False, str(args))
+                    continue
+                try:
+                    armed = True
+                    signal.setitimer(signal.ITIMER_REAL, timeout, timeout / 10)
+                    try:
+                        outcome = (True, func(*args))
+                    finally:
+                        armed = False
+                        signal.setitimer(signal.ITIMER_REAL, 0)
+                except TestTimeout:
+                    outcome = (False, "Timeout")
+                except Exception as e:
+                    outcome = (False, str(e))
+                yield outcome
+        finally:
+            signal.signal(signal.SIGALRM, signal.SIG_DFL if previous is None else previous)
+            if outer_delay > 0:
+                remaining = outer_delay - (time.monotonic() - started)
+                signal.setitimer(signal.ITIMER_REAL, max(remaining, 1e-6), outer_interval)
+        
+    def _run_batch_with_timeout(self, func, batch, timeout=TEST_TIMEOUT):
+        """
+        Run a function on a batch of argument lists, each call with its own timeout.
+        
+        The whole batch is queued on the harness's long-lived test thread
+        instead of starting a thread per call or per batch. If a call times
+        out (e.g. an infinite loop), that thread is abandoned and the remaining
+        calls continue on a fresh one.
+        
+        Args:
+            func: The function to call
+            batch: Argument lists (an Exception entry marks a call that could not be prepared)
+            timeout: Maximum seconds to wait per call
+            
+        Yields:
+            tuple: (success, result_or_error) per call, in batch order. Closing the
+                   generator early cancels the calls that have not started yet.
+        """
+        done = 0
+        
+        while done < len(batch):
+            executor = self._get_executor()
+            futures = [
+                None if isinstance(args, Exception) else executor.submit(func, *args)
+                for args in batch[done:]
+            ]
+            try:
+                for args, future in zip(batch[done:], futures):
+                    done += 1
+                    if future is None:
+                        yield (False, str(args))
+                        continue
+                    try:
+                        outcome = (True, future.result(timeout=timeout))
+                    except concurrent.futures.TimeoutError:
+                        # Never wait for a stuck thread; drop calls queued behind it
+                        self._abandon_executor(futures)
+                        yield (False, "Timeout")
+                        break
+                    except Exception as e:
+                        outcome = (False, str(e))
+                    yield outcome
+            finally:
+                # Pruned: the thread is kept, only the calls not yet started are dropped
+                for future in futures:
+                    if future is not None:
+                        future.cancel()
         
     def get_coverage(self, func, args):
         """
@@ -199,22 +748,10 @@ class TestHarness:
             set: Set of line numbers executed
         """
         covered_lines = set()
-        
-        def trace_func(frame, event, arg):
-            if event == 'line':
-                code_path = os.path.abspath(frame.f_code.co_filename)
-                if code_path == self.patient_path:
-                    covered_lines.add(frame.f_lineno)
-            return trace_func
-            
-        sys.settrace(trace_func)
         try:
-            func(*args)
+            call_with_coverage(func, args, self.patient_path, covered_lines)
         except Exception:
             pass
-        finally:
-            sys.settrace(None)
-            
         return covered_lines
         
     def run_fault_localization(self):
@@ -224,32 +761,12 @@ class TestHarness:
         Returns:
             list: List of (line_number, weight) tuples
         """
-        # Load the original patient module
-        module_name = f"patient_original_{id(self)}"
-        if module_name in sys.modules:
-            del sys.modules[module_name]
-            
-        spec = importlib.util.spec_from_file_location(module_name, self.patient_path)
-        module = importlib.util.module_from_spec(spec)
-        sys.modules[module_name] = module
-        spec.loader.exec_module(module)
-        
-        func = getattr(module, self.function_name)
-        
-        lines_p = set()  # Lines executed by positive tests
-        lines_f = set()  # Lines executed by negative tests
+        # One traced run of the test suite gives both the patient's fitness
+        # (cached for the baseline evaluation) and the coverage of every test
+        self.evaluate_file(self.patient_path, collect_coverage=True)
         
-        # Collect coverage from positive tests
-        for test in self.positive_tests:
-            inputs = self._deep_copy_inputs(test["input"])
-            lines = self.get_coverage(func, inputs)
-            lines_p.update(lines)
-            
-        # Collect coverage from negative tests
-        for test in self.negative_tests:
-            inputs = self._deep_copy_inputs(test["input"])
-            lines = self.get_coverage(func, inputs)
-            lines_f.update(lines)
+        lines_p = set().union(*self._cov_pos)  # Lines executed by positive tests
+        lines_f = set().union(*self._cov_neg)  # Lines executed by negative tests
             
         # Calculate weights based on GenProg formula
         all_lines = lines_p.union(lines_f)
@@ -268,35 +785,221 @@ class TestHarness:
         return weighted_lines
 
 
+# === Coverage ===
+
+def call_with_coverage(func, args, filename, covered_lines):
+    """
+    Call func(*args), adding the lines it runs in code from 'filename' to covered_lines.
+    
+    'filename' is compared as a plain string against co_filename, so it must
+    be the name the code was compiled with (a variant's absolute path, see
+    TestHarness._load_variant_module, or an imported module's __file__).
+    Tracing only covers the calling thread, so this must run on the thread
+    that makes the call. Lines executed before an exception are still recorded.
+    
+    Returns:
+        The function's result (exceptions propagate)
+    """
+    # PEP 669 line events (Python 3.12+) are far cheaper than a trace function
+    if hasattr(sys, "monitoring"):
+        tool_id = _take_monitoring_tool()
+        if tool_id is not None:
+            return _call_monitored(func, args, filename, covered_lines, tool_id)
+    
+    def line_trace(frame, event, arg):
+        if event == 'line':
+            covered_lines.add(frame.f_lineno)
+        return line_trace
+        
+    def call_trace(frame, event, arg):
+        # Only 'call' events reach the global tracer. Returning None leaves
+        # frames outside 'filename' without a line tracer.
+        return line_trace if frame.f_code.co_filename == filename else None
+        
+    sys.settrace(call_trace)
+    try:
+        return func(*args)
+    finally:
+        sys.settrace(None)
+
+
+def _take_monitoring_tool():
+    """
+    Claims a free sys.monitoring tool id, preferring COVERAGE_ID.
+    
+    Returns:
+        int or None: The id (release it with free_tool_id), or None if all
+                     are taken (e.g. by coverage.py and a debugger)
+    """
+    monitoring = sys.monitoring
+    for tool_id in (monitoring.COVERAGE_ID, *range(6)):
+        if monitoring.get_tool(tool_id) is None:
+            try:
+                monitoring.use_tool_id(tool_id, "apr-coverage")
+            except ValueError:
+                continue  # Taken in the meantime
+            return tool_id
+    return None
+
+
+def _call_monitored(func, args, filename, covered_lines, tool_id):
+    """
+    call_with_coverage() through sys.monitoring LINE events (Python 3.12+).
+    
+    Events are enabled only on the code objects from 'filename' (local
+    events), so other tools such as coverage.py or a debugger keep their own
+    settings. Each line is disabled after its first hit, so it costs one
+    callback per run. tool_id must already be taken by the caller; it is
+    released here.
+    """
+    monitoring = sys.monitoring
+    codes = _code_objects_in(func, filename)
+    
+    def on_line(code, line_number):
+        covered_lines.add(line_number)
+        # Each line only needs to be seen once per run
+        return monitoring.DISABLE
+        
+    try:
+        monitoring.register_callback(tool_id, monitoring.events.LINE, on_line)
+        # Setting local events again also re-enables the lines this tool
+        # disabled during a previous run
+        for code in codes:
+            monitoring.set_local_events(tool_id, code, monitoring.events.LINE)
+        try:
+            return func(*args)
+        finally:
+            for code in codes:
+                monitoring.set_local_events(tool_id, code, monitoring.events.NO_EVENTS)
+    finally:
+        monitoring.register_callback(tool_id, monitoring.events.LINE, None)
+        monitoring.free_tool_id(tool_id)
+
+
+def _code_objects_in(func, filename):
+    """
+    Collects the code objects compiled from 'filename' that func can reach.
+    
+    Covers func itself, the functions and class methods in its module
+    globals, and the functions nested in any of those (from co_consts).
+    
+    Returns:
+        list: The code objects, each listed once
+    """
+    found = {}
+    
+    def add_code(code):
+        if code.co_filename != filename or id(code) in found:
+            return
+        found[id(code)] = code
+        for const in code.co_consts:
+            if isinstance(const, types.CodeType):
+                add_code(const)
+                
+    def add_value(value):
+        value = getattr(value, "__func__", value)  # staticmethod/classmethod
+        code = getattr(value, "__code__", None)
+        if isinstance(code, types.CodeType):
+            add_code(code)
+            
+    add_value(func)
+    for value in getattr(func, "__globals__", {}).values():
+        if isinstance(value, type):
+            for attr in vars(value).values():
+                add_value(attr)
+        else:
+            add_value(value)
+    return list(found.values())
+
+
+# === Input copying ===
+
+# Values no test can modify, so every call may share them
+IMMUTABLE_TYPES = (int, float, complex, bool, str, bytes, type(None))
+
+
+def is_immutable(value):
+    """True if value (recursively, through tuples and frozensets) can't be modified."""
+    if isinstance(value, IMMUTABLE_TYPES):
+        return True
+    if isinstance(value, (tuple, frozenset)):
+        return all(is_immutable(item) for item in value)
+    return False
+
+
+def input_copier(arg):
+    """
+    Picks the cheapest way to give a test call its own copy of an argument.
+    
+    Nested mutable arguments are pickled once here; unpickling the bytes per
+    call (in C) measured 6-14x faster than copy.deepcopy on lists of lists
+    and nested dicts.
+    
+    Returns:
+        None if the argument can be shared as is, list.copy/dict.copy for a
+        flat list/dict of immutable values, else a function returning a fresh
+        copy from the pickled bytes (copy.deepcopy if it can't be pickled)
+    """
+    if is_immutable(arg):
+        return None
+    if type(arg) is list and all(is_immutable(item) for item in arg):
+        return list.copy
+    if type(arg) is dict and all(is_immutable(item) for item in arg.values()):
+        return dict.copy
+    try:
+        blob = pickle.dumps(arg, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception:
+        return copy.deepcopy
+        
+    def unpickle_copy(arg, _blob=blob):
+        return pickle.loads(_blob)
+    return unpickle_copy
+
+
+def input_copiers(inputs):
+    """input_copier() for every argument of a test case."""
+    return tuple(input_copier(arg) for arg in inputs)
+
+
 # === Legacy compatibility (for old code that imports directly) ===
 
-# Default values (will be overwritten when TestHarness is used)
-POSITIVE_TESTS = []
-NEGATIVE_TESTS = []
-WEIGHT_POS = 1.0
-WEIGHT_NEG = 10.0
+# POSITIVE_TESTS, NEGATIVE_TESTS, WEIGHT_POS and WEIGHT_NEG are built on first
+# access (see __getattr__ below), so importing this module reads no benchmark
+
+# Benchmark the legacy globals describe (the original find_max patient)
+LEGACY_BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks", "benchmark1")
+
+LEGACY_NAMES = ("POSITIVE_TESTS", "NEGATIVE_TESTS", "WEIGHT_POS", "WEIGHT_NEG")
 
 
 def load_legacy_tests():
-    """Load tests from the old patient.py location for backwards compatibility."""
+    """
+    Load the legacy globals for backwards compatibility.
+    
+    They are views of benchmark1's tests.json, read through a TestHarness,
+    so the test data lives in one place: each test is (first input argument,
+    expected result). If the benchmark can't be read, the globals keep their
+    defaults (no tests, weights 1.0/10.0).
+    """
     global POSITIVE_TESTS, NEGATIVE_TESTS, WEIGHT_POS, WEIGHT_NEG
     
-    POSITIVE_TESTS = [
-        ([5, 5, 5], 5),
-        ([42], 42),
-        ([0, 0, 0], 0)
-    ]
-    NEGATIVE_TESTS = [
-        ([-1, 0, 5], 5),
-        ([1, 2, 3, 4], 4),
-        ([10, 30, 20], 30)
-    ]
-    WEIGHT_POS = 1.0
-    WEIGHT_NEG = 10.0
-
-
-# Load legacy tests on import
-load_legacy_tests()
+    POSITIVE_TESTS, NEGATIVE_TESTS, WEIGHT_POS, WEIGHT_NEG = [], [], 1.0, 10.0
+    try:
+        harness = TestHarness(LEGACY_BENCHMARK_DIR)
+        POSITIVE_TESTS = [(test["input"][0], test["expected"]) for test in harness.positive_tests]
+        NEGATIVE_TESTS = [(test["input"][0], test["expected"]) for test in harness.negative_tests]
+        WEIGHT_POS = harness.positive_weight
+        WEIGHT_NEG = harness.negative_weight
+    except (OSError, ValueError, KeyError):
+        POSITIVE_TESTS, NEGATIVE_TESTS = [], []
+
+
+def __getattr__(name):
+    """Builds the legacy globals the first time one is looked up (PEP 562)."""
+    if name in LEGACY_NAMES:
+        load_legacy_tests()
+        return globals()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":